@@ -0,0 +1,73 @@
+"""
+Fast /proc scraping for the measurement loop on Linux.
+
+psutil re-opens the /proc files on every call, which costs several
+syscalls per tick. This module keeps /proc/diskstats and /proc/net/dev
+open across ticks and re-reads both in one pass, so a sample is two
+pread-style reads on cached file objects. On other platforms (the
+primary Windows target included) callers fall back to psutil.
+"""
+
+import re
+import sys
+
+# Whole-disk device names; partition rows are skipped so bytes are not
+# counted twice.
+_DISK_NAME_RE = re.compile(r"(sd[a-z]+|vd[a-z]+|xvd[a-z]+|hd[a-z]+|nvme\d+n\d+|mmcblk\d+)")
+
+_SECTOR_SIZE = 512
+
+
+class ProcSampler:
+    """
+    Cumulative disk and network byte counters read straight from /proc.
+    """
+
+    def __init__(self, diskstats, netdev):
+        self._diskstats = diskstats
+        self._netdev = netdev
+
+    @classmethod
+    def create(cls):
+        """
+        Return a ProcSampler, or None when /proc is not available.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            diskstats = open("/proc/diskstats", "r")
+            netdev = open("/proc/net/dev", "r")
+        except OSError:
+            return None
+        return cls(diskstats, netdev)
+
+    def sample(self):
+        """
+        :return: (disk_bytes, net_bytes) cumulative totals since boot
+        """
+        disk_bytes = 0
+        self._diskstats.seek(0)
+        for line in self._diskstats:
+            fields = line.split()
+            if len(fields) < 10 or not _DISK_NAME_RE.fullmatch(fields[2]):
+                continue
+            # Field 6 is sectors read, field 10 is sectors written.
+            disk_bytes += (int(fields[5]) + int(fields[9])) * _SECTOR_SIZE
+
+        net_bytes = 0
+        self._netdev.seek(0)
+        for line in self._netdev:
+            if ":" not in line:
+                continue
+            name, _, rest = line.partition(":")
+            if name.strip() == "lo":
+                continue
+            fields = rest.split()
+            # Field 1 is received bytes, field 9 is transmitted bytes.
+            net_bytes += int(fields[0]) + int(fields[8])
+
+        return disk_bytes, net_bytes
+
+    def close(self):
+        self._diskstats.close()
+        self._netdev.close()
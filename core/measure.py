@@ -1,42 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
 from time import perf_counter
+import logging
+import queue
+import threading
+
 import psutil
-import time
+from codecarbon.core._fastproc import ProcSampler
 from codecarbon.external.hardware import CPU, GPU, RAM, AppleSiliconChip
 from codecarbon.external.logger import logger
 
+# Reciprocal of the ~1 Gbps (125 MB/s) saturation threshold, so the
+# per-tick ratio is a multiply instead of a divide.
+_INV_NET_MAX = 1.0 / 125_000_000
+
+# Hardware types with a dedicated handler; a tuple gives the subclass
+# fallback a single C-level isinstance check.
+_KNOWN_HARDWARE = (CPU, GPU, RAM, AppleSiliconChip)
+
 
 class MeasurePowerEnergy:
     """
     Measure power and energy consumption of a hardware component.
     """
-    disk_base_watts = None
-    network_base_watts = None
-    peripherals_base_watts = None
-
-    _last_measured_time: int = 0
-    _hardware: list
-    _pue: float
-    _total_cpu_energy: float
-    _total_gpu_energy: float
-    _total_ram_energy: float
-    _total_energy: float
-    _cpu_power: float
-    _gpu_power: float
-    _ram_power: float
-
-    def __init__(self, hardware, pue, disk_power=10, network_power=3, peripheral_power=10):
+    # Base power assumptions, kept at class scope so they are bound once and
+    # can be overridden by subclassing for other machines.
+    _CPU_TDP_W = 65  # Approximate TDP for an i7-10750H
+    _DISK_W = 10  # SSDs: ~6W + ~4W
+    _NET_W = 3  # Assumed draw at full bandwidth
+    _PERIPHERALS_W = 10  # Estimate for USB, audio, etc.
+
+    # No per-instance __dict__: attribute reads in the per-tick paths become
+    # fixed-offset slot fetches. Subclasses adding attributes must declare
+    # their own __slots__.
+    __slots__ = (
+        "_last_measured_time",
+        "_tick_now",
+        "_hardware",
+        "_pue",
+        "_estimate_system_power",
+        "_system_power_listeners",
+        "disk_base_watts",
+        "network_base_watts",
+        "peripherals_base_watts",
+        "_total_cpu_energy",
+        "_total_gpu_energy",
+        "_total_ram_energy",
+        "_total_energy",
+        "_cpu_power",
+        "_gpu_power",
+        "_ram_power",
+        "_system_power",
+        "system_energy",
+        "_fastproc",
+        "_pool",
+        "_prev_disk_bytes",
+        "_prev_net_bytes",
+        "_prev_sample_ts",
+        "_prev_cpu_times",
+        "_ewma_cpu",
+        "_fast_cpu",
+        "_cpu_count",
+        "_interval",
+        "_vm_percent",
+        "_vm_percent_ts",
+        "_queue",
+        "_worker",
+        "_log_parts",
+        "_dispatch",
+        "_apple_dispatch",
+        "_hardware_handlers",
+    )
+
+    def __init__(self, hardware, pue, disk_power=None, network_power=None, peripheral_power=None,
+                 estimate_system_power=True, fast_cpu=False):
         """
         :param hardware: list of hardware components to measure
         :param pue: Power Usage Effectiveness of the datacenter
+        :param estimate_system_power: estimate disk/network/peripherals draw
+            at the end of each do_measure() tick
+        :param fast_cpu: derive CPU utilization from the OS-maintained load
+            average instead of cpu_times() deltas; coarser but cheaper
         """
 
         self._last_measured_time = perf_counter()
+        self._tick_now = self._last_measured_time
         self._hardware = hardware
         self._pue = pue
+        self._estimate_system_power = estimate_system_power
+        self._system_power_listeners = []
 
-        self.disk_base_watts = disk_power
-        self.network_base_watts = network_power
-        self.peripherals_base_watts = peripheral_power
+        self.disk_base_watts = disk_power if disk_power is not None else self._DISK_W
+        self.network_base_watts = network_power if network_power is not None else self._NET_W
+        self.peripherals_base_watts = (
+            peripheral_power if peripheral_power is not None else self._PERIPHERALS_W
+        )
 
 
         # TODO: Read initial energy values from hardware
@@ -51,10 +108,168 @@ class MeasurePowerEnergy:
         self._system_power = 0
         self.system_energy = 0
 
-    def get_estimated_system_power(self):
+        # On Linux, read the counters straight from /proc through file
+        # objects kept open across ticks; elsewhere fall back to psutil,
+        # overlapping the two counter reads on a small pool since each one
+        # can take milliseconds against the Windows performance-counter
+        # APIs and the GIL is released inside psutil's C layer.
+        self._fastproc = ProcSampler.create()
+        self._pool = None
+        if self._fastproc is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="codecarbon_io_sample"
+            )
+
+        # Prime the counters so the first call to
+        # get_estimated_system_power() can compute deltas over the real
+        # elapsed interval instead of sleeping for a fixed second.
+        self._prev_disk_bytes, self._prev_net_bytes = self._sample_io_bytes()
+        self._prev_sample_ts = perf_counter()
+
+        # CPU utilization is derived from cpu_times() jiffy deltas between
+        # ticks and smoothed with an EWMA, so no psutil call ever blocks and
+        # the first reading is not biased to zero like cpu_percent(None).
+        self._prev_cpu_times = psutil.cpu_times()
+        self._ewma_cpu = 0.0
+        self._fast_cpu = fast_cpu
+        self._cpu_count = psutil.cpu_count() or 1
+
+        # Adaptive cadence: poll fast when the system is busy, back off when
+        # it is idle so the monitor's own draw shrinks. Updated every tick,
+        # consumed by callers through next_sleep().
+        self._interval = 5.0
+        # RAM usage moves slowly, so the virtual_memory() read feeding the
+        # cadence is cached with a short TTL instead of taken every tick.
+        self._vm_percent = 0.0
+        self._vm_percent_ts = 0.0
+
+        # Recording happens off the hot path: do_measure() only samples the
+        # hardware and enqueues snapshots, while a daemon worker drains the
+        # queue and owns energy accumulation and log formatting. The worker
+        # is started lazily on the first enqueue.
+        self._queue = queue.Queue(maxsize=256)
+        self._worker = None
+        # Per-hardware log fragments collected by the worker and emitted as
+        # one record at the end of each tick, so the logging framework's
+        # handler lock is taken once per tick instead of once per hardware.
+        self._log_parts = []
+
+        # Dispatch on the concrete hardware type with a single dict lookup
+        # instead of walking an isinstance chain on every iteration.
+        self._dispatch = {
+            CPU: self._on_cpu,
+            GPU: self._on_gpu,
+            RAM: self._on_ram,
+            AppleSiliconChip: self._on_apple_silicon,
+        }
+        self._apple_dispatch = {
+            "CPU": self._on_apple_cpu,
+            "GPU": self._on_apple_gpu,
+        }
+
+        # The hardware list does not change after construction, so pair each
+        # object with its handler once; unknown types are reported here
+        # instead of on every tick.
+        self._hardware_handlers = []
+        for hw in hardware:
+            hw_type = type(hw)
+            handler = self._dispatch.get(hw_type)
+            if handler is None and isinstance(hw, _KNOWN_HARDWARE):
+                # Subclass of a known type: resolve it once and cache the
+                # handler so further instances hit the exact-type lookup.
+                for klass in _KNOWN_HARDWARE:
+                    if issubclass(hw_type, klass):
+                        handler = self._dispatch[klass]
+                        self._dispatch[hw_type] = handler
+                        break
+            if handler is None:
+                logger.error(f"Unknown hardware type: {hw} ({type(hw)})")
+                continue
+            self._hardware_handlers.append((hw, handler))
+
+    def _cpu_percent(self):
+        """
+        :return: EWMA-smoothed CPU utilization in percent, non-blocking
+        """
+        if self._fast_cpu:
+            # The load average is maintained by the OS (emulated by psutil
+            # on Windows), so this is a free read of a rolling metric.
+            load_ratio = psutil.getloadavg()[0] / self._cpu_count
+            return 100.0 * (load_ratio if load_ratio < 1.0 else 1.0)
+        cur = psutil.cpu_times()
+        prev = self._prev_cpu_times
+        busy = (cur.user + cur.system) - (prev.user + prev.system)
+        total = sum(cur) - sum(prev)
+        if total > 0:
+            pct = 100.0 * busy / total
+            self._ewma_cpu = 0.7 * self._ewma_cpu + 0.3 * pct
+            self._prev_cpu_times = cur
+        return self._ewma_cpu
+
+    def _sample_io_bytes(self):
+        """
+        :return: (disk_bytes, net_bytes) cumulative totals
+        """
+        if self._fastproc is not None:
+            return self._fastproc.sample()
+        disk_future = self._pool.submit(psutil.disk_io_counters)
+        net_future = self._pool.submit(psutil.net_io_counters)
+        disk = disk_future.result()
+        net = net_future.result()
+        return disk.read_bytes + disk.write_bytes, net.bytes_sent + net.bytes_recv
+
+    def close(self):
+        """
+        Release the sampling resources (thread pool, /proc file objects).
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if self._fastproc is not None:
+            self._fastproc.close()
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._drain_queue,
+                name="codecarbon_measure_worker",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def _drain_queue(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._apply_measurement(*item)
+            except Exception:
+                # The worker must outlive any single bad snapshot: a raised
+                # exception would otherwise kill the daemon thread and stop
+                # all recording silently.
+                logger.exception("Error while recording a measurement")
+            finally:
+                self._queue.task_done()
+
+    def _enqueue(self, item):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Drop the oldest snapshot rather than blocking the caller.
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def get_estimated_system_power(self, now=None):
         """
         Estimate system power excluding CPU and RAM.
         Includes approximated disk, network, and peripherals draw.
+
+        :param now: perf_counter() timestamp to reuse; read fresh when None
         """
         # === Base power assumptions ===
         """
@@ -63,113 +278,199 @@ class MeasurePowerEnergy:
         network_base_watts = 3                # Assumed draw at full bandwidth
         peripherals_base_watts = 10           # Estimate for USB, audio, etc.
         """
-        disk_base_watts = self.disk_base_watts
-        network_base_watts = self.network_base_watts
-        peripherals_base_watts = self.peripherals_base_watts
-        network_max_bytes = 125_000_000  # ~1 Gbps = 125MB/s
+        # Sample the counters once and compute byte deltas over the real
+        # elapsed interval since the previous call, instead of blocking the
+        # measurement loop with time.sleep(1) around each counter read.
+        if now is None:
+            now = perf_counter()
+        disk_bytes, net_bytes = self._sample_io_bytes()
+        dt = now - self._prev_sample_ts
+        if dt <= 0:
+            return self._system_power
 
         # === Disk usage ===
-        disk1 = psutil.disk_io_counters()
-        time.sleep(1)  # Measure over 1 second
-        disk2 = psutil.disk_io_counters()
-        bytes_read = disk2.read_bytes - disk1.read_bytes
-        bytes_written = disk2.write_bytes - disk1.write_bytes
-        total_bytes = bytes_read + bytes_written
-        disk_usage_ratio = min(total_bytes / network_max_bytes, 1.0)
-        disk_power = disk_usage_ratio * disk_base_watts
-        # disk_power = disk_base_watts  # Uncomment if you want to use the base power directly
+        disk_bytes_per_sec = (disk_bytes - self._prev_disk_bytes) / dt
+        disk_usage_ratio = disk_bytes_per_sec * _INV_NET_MAX
+        disk_usage_ratio = disk_usage_ratio if disk_usage_ratio < 1.0 else 1.0
+        disk_power = disk_usage_ratio * self.disk_base_watts
+        # disk_power = self.disk_base_watts  # Uncomment if you want to use the base power directly
         # disk_power = 0  # Uncomment if you want to ignore disk power
 
         # === Network usage ===
-        net1 = psutil.net_io_counters()
-        time.sleep(1)  # Measure over 1 second
-        net2 = psutil.net_io_counters()
-        bytes_sent = net2.bytes_sent - net1.bytes_sent
-        bytes_recv = net2.bytes_recv - net1.bytes_recv
-        total_bytes = bytes_sent + bytes_recv
-        net_usage_ratio = min(total_bytes / network_max_bytes, 1.0)
-        network_power = net_usage_ratio * network_base_watts
+        net_bytes_per_sec = (net_bytes - self._prev_net_bytes) / dt
+        net_usage_ratio = net_bytes_per_sec * _INV_NET_MAX
+        net_usage_ratio = net_usage_ratio if net_usage_ratio < 1.0 else 1.0
+        network_power = net_usage_ratio * self.network_base_watts
+
+        self._prev_disk_bytes = disk_bytes
+        self._prev_net_bytes = net_bytes
+        self._prev_sample_ts = now
 
         # === Combine all estimates ===
-        self._system_power = disk_power + network_power + peripherals_base_watts
+        self._system_power = disk_power + network_power + self.peripherals_base_watts
+        self._update_interval()
         return self._system_power
 
   
 
     def do_measure(self) -> None:
-        for hardware in self._hardware:
-            h_time = perf_counter()
-            # Compute last_duration again for more accuracy
-            last_duration = perf_counter() - self._last_measured_time
+        # One timestamp per tick, cached on the instance and shared by the
+        # hardware loop and the system power estimator: every hardware
+        # object sees the same duration, and per-hardware timing is only
+        # taken when the debug log that reports it is enabled.
+        self._tick_now = t0 = perf_counter()
+        last_duration = t0 - self._last_measured_time
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for hardware, handler in self._hardware_handlers:
+            h_start = perf_counter() if debug else 0.0
             power, energy = hardware.measure_power_and_energy(
                 last_duration=last_duration
             )
-            # Apply the PUE of the datacenter to the consumed energy
-            energy *= self._pue
-            self._total_energy += energy
-            if isinstance(hardware, CPU):
-                # Estimate power from CPU usage using psutil
-                cpu_percent = psutil.cpu_percent(interval=None)
-                cpu_base_watts = 65  # Approximate TDP for your i7-10750H
-
-                estimated_cpu_power = (cpu_percent / 100) * cpu_base_watts
-                power.W = estimated_cpu_power  # Override power reading
-
-                self._total_cpu_energy += energy
-                self._cpu_power = power
-
-                logger.info(
-                    f"Energy consumed for all CPUs : {self._total_cpu_energy.kWh:.6f} kWh"
-                    + f". Estimated CPU Power : {self._cpu_power.W:.2f} W"
-                )
-            elif isinstance(hardware, GPU):
-                self._total_gpu_energy += energy
-                self._gpu_power = power
-                logger.info(
-                    f"Energy consumed for all GPUs : {self._total_gpu_energy.kWh:.6f} kWh"
-                    + f". Total GPU Power : {self._gpu_power.W} W"
-                )
-            elif isinstance(hardware, RAM):
-                self._total_ram_energy += energy
-                self._ram_power = power
-                logger.info(
-                    f"Energy consumed for RAM : {self._total_ram_energy.kWh:.6f} kWh."
-                    + f"RAM Power : {self._ram_power.W} W"
-                )
-            elif isinstance(hardware, AppleSiliconChip):
-                if hardware.chip_part == "CPU":
-                    self._total_cpu_energy += energy
-                    self._cpu_power = power
-                    logger.info(
-                        f"Energy consumed for AppleSilicon CPU : {self._total_cpu_energy.kWh:.6f} kWh"
-                        + f".Apple Silicon CPU Power : {self._cpu_power.W} W"
+            h_time = perf_counter() - h_start if debug else 0.0
+            self._enqueue((hardware, handler, power, energy, last_duration, h_time))
+        # Estimating system power is pure waste when nothing consumes it:
+        # only sample disk/net when a listener subscribed or the summary
+        # log lines will actually be emitted.
+        system_power = None
+        if self._estimate_system_power and (
+            self._system_power_listeners or logger.isEnabledFor(logging.INFO)
+        ):
+            system_power = self.get_estimated_system_power(now=self._tick_now)
+            for listener in self._system_power_listeners:
+                listener(system_power)
+        # The tick item carries the system power (None when estimation was
+        # skipped) and tells the worker to flush the aggregated log record.
+        self._enqueue((None, None, system_power, None, last_duration, 0.0))
+        self._last_measured_time = t0
+
+    def register_system_power_listener(self, listener):
+        """
+        Register a callable invoked with the estimated system power (W)
+        after each do_measure() tick.
+        """
+        self._system_power_listeners.append(listener)
+
+    def _ram_percent(self):
+        """
+        :return: RAM usage in percent, cached with a 5 s TTL
+        """
+        now = perf_counter()
+        if now - self._vm_percent_ts > 5.0:
+            self._vm_percent = psutil.virtual_memory().percent
+            self._vm_percent_ts = now
+        return self._vm_percent
+
+    def _update_interval(self):
+        # Take a fresh reading: the EWMA field is only refreshed when
+        # _cpu_percent() runs, which the tracker's flow does not guarantee
+        # on every tick.
+        activity = self._cpu_percent()
+        ram_percent = self._ram_percent()
+        if ram_percent > activity:
+            activity = ram_percent
+        interval = 0.5 + (1.0 - activity / 100.0) * 9.5
+        if interval < 0.5:
+            interval = 0.5
+        elif interval > 10.0:
+            interval = 10.0
+        self._interval = interval
+
+    def next_sleep(self):
+        """
+        :return: suggested seconds to sleep before the next do_measure() call
+        """
+        return self._interval
+
+    def _apply_measurement(self, hardware, handler, power, energy, last_duration, h_time):
+        if hardware is None:
+            # End-of-tick snapshot: accumulate system energy, then emit the
+            # whole tick as a single log record.
+            if power is not None:
+                self.system_energy += (power * last_duration) / 3600
+                if logger.isEnabledFor(logging.INFO):
+                    self._log_parts.append(
+                        "Estimated Total System Power (software-based): %.2f W"
+                        % power
+                    )
+                    self._log_parts.append(
+                        "Estimated System Energy (software-based): %.6f kWh"
+                        % self.system_energy
                     )
-                elif hardware.chip_part == "GPU":
-                    self._total_gpu_energy += energy
-                    self._gpu_power = power
-                    logger.info(
-                        f"Energy consumed for AppleSilicon GPU : {self._total_gpu_energy.kWh:.6f} kWh"
-                        + f".Apple Silicon GPU Power : {self._gpu_power.W} W"
+                    self._log_parts.append(
+                        "%.6f kWh of electricity used since the beginning."
+                        % self._total_energy
                     )
-            else:
-                logger.error(f"Unknown hardware type: {hardware} ({type(hardware)})")
-            h_time = perf_counter() - h_time
+            if self._log_parts:
+                logger.info(" | ".join(self._log_parts))
+                self._log_parts.clear()
+            return
+        # Accumulate raw kWh floats: applying the PUE on the extracted value
+        # avoids allocating a new Energy wrapper per hardware per tick.
+        energy_kwh = energy.kWh * self._pue
+        self._total_energy += energy_kwh
+        handler(hardware, power, energy_kwh)
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"{hardware.__class__.__name__} : {hardware.total_power().W:,.2f} "
-                + f"W during {last_duration:,.2f} s [measurement time: {h_time:,.4f}]"
+                "%s : %.2f W during %.2f s [measurement time: %.4f]",
+                hardware.__class__.__name__,
+                hardware.total_power().W,
+                last_duration,
+                h_time,
             )
-        self._system_power = self.get_estimated_system_power()
-        last_duration = perf_counter() - self._last_measured_time
 
-        self.system_energy += (self._system_power * last_duration) / 3600  
+    def _on_cpu(self, hardware, power, energy_kwh):
+        # Estimate power from CPU usage using psutil
+        cpu_percent = self._cpu_percent()
 
-        logger.info(f"Estimated Total System Power (software-based): {self._system_power:.2f} W")
-        logger.info(f"Estimated System Energy (software-based): {self.system_energy:.6f} kWh")
+        estimated_cpu_power = (cpu_percent / 100) * self._CPU_TDP_W
+        power.W = estimated_cpu_power  # Override power reading
 
-        logger.info(
-            f"{self._total_energy.kWh:.6f} kWh of electricity used since the beginning."
-        )
-        self._last_measured_time = perf_counter()  
+        self._total_cpu_energy += energy_kwh
+        self._cpu_power = power.W
+
+        if logger.isEnabledFor(logging.INFO):
+            self._log_parts.append(
+                "Energy consumed for all CPUs : %.6f kWh. Estimated CPU Power : %.2f W"
+                % (self._total_cpu_energy, self._cpu_power)
+            )
 
+    def _on_gpu(self, hardware, power, energy_kwh):
+        self._total_gpu_energy += energy_kwh
+        self._gpu_power = power.W
+        if logger.isEnabledFor(logging.INFO):
+            self._log_parts.append(
+                "Energy consumed for all GPUs : %.6f kWh. Total GPU Power : %s W"
+                % (self._total_gpu_energy, self._gpu_power)
+            )
+
+    def _on_ram(self, hardware, power, energy_kwh):
+        self._total_ram_energy += energy_kwh
+        self._ram_power = power.W
+        if logger.isEnabledFor(logging.INFO):
+            self._log_parts.append(
+                "Energy consumed for RAM : %.6f kWh.RAM Power : %s W"
+                % (self._total_ram_energy, self._ram_power)
+            )
+
+    def _on_apple_silicon(self, hardware, power, energy_kwh):
+        handler = self._apple_dispatch.get(hardware.chip_part)
+        if handler is not None:
+            handler(hardware, power, energy_kwh)
+
+    def _on_apple_cpu(self, hardware, power, energy_kwh):
+        self._total_cpu_energy += energy_kwh
+        self._cpu_power = power.W
+        if logger.isEnabledFor(logging.INFO):
+            self._log_parts.append(
+                "Energy consumed for AppleSilicon CPU : %.6f kWh.Apple Silicon CPU Power : %s W"
+                % (self._total_cpu_energy, self._cpu_power)
+            )
 
-   
\ No newline at end of file
+    def _on_apple_gpu(self, hardware, power, energy_kwh):
+        self._total_gpu_energy += energy_kwh
+        self._gpu_power = power.W
+        if logger.isEnabledFor(logging.INFO):
+            self._log_parts.append(
+                "Energy consumed for AppleSilicon GPU : %.6f kWh.Apple Silicon GPU Power : %s W"
+                % (self._total_gpu_energy, self._gpu_power)
+            )
\ No newline at end of file
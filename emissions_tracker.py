@@ -564,6 +564,10 @@ class BaseEmissionsTracker(ABC):
         # scheduled measurement to shutdown
         # or if scheduler interval was longer than the run
         self._measure_power_and_energy()
+        # Release the estimator's sampling resources (thread pool, /proc
+        # file objects); start() builds a fresh one on each run.
+        if getattr(self, "_measure_power_energy", None) is not None:
+            self._measure_power_energy.close()
 
         emissions_data = self._prepare_emissions_data()
         emissions_data_delta = self._compute_emissions_delta(emissions_data)
@@ -704,10 +708,6 @@ class BaseEmissionsTracker(ABC):
         """
 
     def _do_measurements(self) -> None:
-        from codecarbon.core.measure import MeasurePowerEnergy
-        # Create system power estimator object
-        power_estimator = MeasurePowerEnergy([], pue=self._pue)
-
         for hardware in self._hardware:
             h_time = time.perf_counter()
             # Compute last_duration again for more accuracy
@@ -765,7 +765,10 @@ class BaseEmissionsTracker(ABC):
         logger.info(
             f"{self._total_energy.kWh:.6f} kWh of electricity used since the beginning."
         )
-        self._system_power = power_estimator.get_estimated_system_power()
+        # Reuse the estimator created in start() so disk/net deltas are
+        # computed over the real interval between ticks, instead of
+        # constructing a fresh estimator on every call.
+        self._system_power = self._measure_power_energy.get_estimated_system_power()
         logger.info(f"Estimated Total System Power (software-based): {self._system_power:.2f} W")
 
 
@@ -786,7 +789,13 @@ class BaseEmissionsTracker(ABC):
             logger.warning(warn_msg, last_duration)
 
         self._do_measurements()
-        self._system_power = self._measure_power_energy.get_estimated_system_power()
+        # Adapt the sampling cadence to system activity: poll faster under
+        # load, never slower than the configured interval. stop() clears the
+        # scheduler before the final measurement, so guard the assignment.
+        if self._scheduler:
+            self._scheduler.interval = min(
+                self._measure_power_secs, self._measure_power_energy.next_sleep()
+            )
         self._last_measured_time = time.perf_counter()
         self._measure_occurrence += 1
         # Special case: metrics and api calls are sent every `api_call_interval` measures